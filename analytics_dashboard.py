@@ -13,6 +13,10 @@ if not os.path.exists(LOG_FILE):
 # Load data
 df = pd.read_csv(LOG_FILE, encoding="utf-8")
 
+# Drop synthetic feedback written by load_test.py if a run ever pointed at this log
+if "MessageID" in df.columns:
+    df = df[~df["MessageID"].astype(str).str.startswith("loadtest-")]
+
 # Convert timestamp to datetime
 df["Timestamp"] = pd.to_datetime(df["Timestamp"])
 
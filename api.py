@@ -1,5 +1,7 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from quart import Quart, request, jsonify
+from quart_cors import cors
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import sys
 import os
 
@@ -14,27 +16,42 @@ scripts_dir_path = os.path.join(current_api_dir, 'scripts')
 sys.path.append(scripts_dir_path)
 # --- END PATH ADJUSTMENT ---
 
-from rag_pipeline import cached_chat
-from logger import log_feedback
+from rag_pipeline import acached_chat
+from logger import init_logger, log_feedback
 
-app = Flask(__name__)
-CORS(app) # Enable CORS for all routes
+# Upper bound for one /ask request (search + LLM round trip + evaluation)
+REQUEST_TIMEOUT_S = float(os.getenv("REQUEST_TIMEOUT_S", "30"))
+
+# Single writer thread so concurrent feedback rows never interleave in the CSV
+log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feedback-log")
+
+# Quart is the asyncio port of Flask: one process serves many in-flight LLM calls,
+# and a handler is cancelled when its client disconnects
+init_logger() # Make sure the feedback log (and its header row) exists before the first write
+
+app = Quart(__name__)
+app = cors(app, allow_origin="*") # Enable CORS for all routes
+
+SUPPORT_CONTACT_INFO = { # Provide structured contact info for frontend
+    "phone": "+91-88840 00687",
+    "email": "support@welleazy.com"
+}
 
 @app.route("/ask", methods=["POST"])
-def ask_question():
+async def ask_question():
     """
     Handles incoming chat queries, processes them using the RAG pipeline,
     and returns the answer along with metadata.
     """
     try:
-        data = request.get_json()
+        data = await request.get_json()
         query = data.get("query")
 
         if not query:
             return jsonify({"error": "Query not provided"}), 400
 
         # Call the RAG pipeline's chat function
-        answer, context, metrics = cached_chat(query)
+        answer, context, metrics = await asyncio.wait_for(acached_chat(query), REQUEST_TIMEOUT_S)
 
         # Determine if escalation is needed based on bot's answer
         escalate = False
@@ -69,6 +86,15 @@ def ask_question():
             "escalation_reason": escalation_reason
         })
 
+    except asyncio.TimeoutError:
+        app.logger.warning(f"/ask request timed out after {REQUEST_TIMEOUT_S}s")
+        return jsonify({
+            "error": "The request took too long to process.",
+            "escalate": True,
+            "escalation_reason": f"Backend timeout after {REQUEST_TIMEOUT_S:g} seconds",
+            "contact_info": SUPPORT_CONTACT_INFO
+        }), 504
+
     except Exception as e:
         app.logger.error(f"Error processing /ask request: {e}", exc_info=True)
         # Return generic error message, consistent with UI for backend errors
@@ -76,19 +102,16 @@ def ask_question():
             "error": "An internal server error occurred.",
             "escalate": True,
             "escalation_reason": f"Backend internal error: {str(e)}",
-            "contact_info": { # Provide structured contact info for frontend
-                "phone": "+91-88840 00687",
-                "email": "support@welleazy.com"
-            }
+            "contact_info": SUPPORT_CONTACT_INFO
         }), 500
 
 @app.route("/log_feedback", methods=["POST"])
-def log_user_feedback():
+async def log_user_feedback():
     """
     Receives and logs user feedback for bot responses.
     """
     try:
-        data = request.get_json()
+        data = await request.get_json()
         message_id = data.get("messageId")
         feedback = data.get("feedback") # '👍' or '👎'
         query = data.get("query")
@@ -99,14 +122,16 @@ def log_user_feedback():
         if not all([message_id, feedback, query, bot_response]):
             return jsonify({"error": "Missing required feedback data"}), 400
 
-        log_feedback(
+        # File I/O runs off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(log_executor, lambda: log_feedback(
             query=query,
             response=bot_response,
             feedback=feedback,
             message_id=message_id,
             escalated=escalated,
             escalation_reason=escalation_reason
-        )
+        ))
 
         return jsonify({"status": "Feedback logged successfully"}), 200
 
@@ -114,5 +139,23 @@ def log_user_feedback():
         app.logger.error(f"Error logging feedback: {e}", exc_info=True)
         return jsonify({"error": "An internal server error occurred while logging feedback"}), 500
 
+@app.route("/cache_stats", methods=["GET"])
+async def cache_stats():
+    """
+    Reports hit/miss counters of the query cache, used by load_test.py.
+    """
+    info = acached_chat.cache_info()
+    # Coalesced lookups joined an identical in-flight call; they count as lookups but not hits
+    lookups = info.hits + info.misses + info.coalesced
+    return jsonify({
+        "hits": info.hits,
+        "misses": info.misses,
+        "coalesced": info.coalesced,
+        "currsize": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0
+    })
+
+# Development server; in production run with an ASGI server, e.g. `hypercorn api:app --bind 0.0.0.0:5000`
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,68 @@
+import asyncio
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+# Like functools' CacheInfo, plus calls that joined an identical in-flight call
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize", "coalesced"])
+
+
+# lru_cache for coroutine functions taking a single hashable argument.
+# Concurrent calls for the same query share one in-flight task ("coalesced");
+# the task is cancelled only when every caller waiting on it is cancelled.
+# hits counts only answers served from completed results, like functools.lru_cache.
+def async_lru_cache(maxsize=100):
+    def decorator(func):
+        cache = OrderedDict()
+        in_flight = {}
+        waiters = {}
+        stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+        def forget(query, task):
+            if in_flight.get(query) is task:
+                del in_flight[query]
+
+        def store(query, task):
+            forget(query, task)
+            waiters.pop(task, None)
+            if task.cancelled() or task.exception() is not None:
+                return
+            cache[query] = task.result()
+            cache.move_to_end(query)
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+
+        @wraps(func)
+        async def wrapper(query):
+            if query in cache:
+                stats["hits"] += 1
+                cache.move_to_end(query)
+                return cache[query]
+
+            task = in_flight.get(query)
+            if task is None:
+                stats["misses"] += 1
+                task = in_flight[query] = asyncio.ensure_future(func(query))
+                task.add_done_callback(lambda t, q=query: store(q, t))
+            else:
+                stats["coalesced"] += 1
+
+            waiters[task] = waiters.get(task, 0) + 1
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Caller went away (client disconnect or timeout): stop the work if nobody else needs it.
+                # Forget the task right away so a caller arriving before it finishes starts a fresh one.
+                if not task.done() and waiters.get(task) == 1:
+                    forget(query, task)
+                    task.cancel()
+                raise
+            finally:
+                if task in waiters:
+                    waiters[task] -= 1
+
+        def cache_info():
+            return CacheInfo(stats["hits"], stats["misses"], maxsize, len(cache), stats["coalesced"])
+
+        wrapper.cache_info = cache_info
+        return wrapper
+    return decorator
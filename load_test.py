@@ -0,0 +1,399 @@
+import argparse
+import csv
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+# Replays logged user queries against a running api.py to find throughput and tail latency limits.
+# Start the API with the offline stub LLM to avoid spending OpenAI quota:
+#   WELLEAZY_STUB_LLM=1 python api.py
+#   python load_test.py --requests 500 --concurrency 32 --rate 20
+
+LOG_FILE = "logs/chat_log.csv"
+RESULTS_DIR = "load_test_results"
+
+# Marks feedback rows written by this harness so they are never replayed or reported as real traffic.
+# With WELLEAZY_STUB_LLM=1 the API writes them to logs/load_test_chat_log.csv, not LOG_FILE.
+MESSAGE_ID_PREFIX = "loadtest-"
+
+# api.py's REQUEST_TIMEOUT_S; read from the same environment variable when both run on one machine
+SERVER_REQUEST_TIMEOUT_S = float(os.getenv("REQUEST_TIMEOUT_S", "30"))
+
+# rag_pipeline.py (Guardrail 3) returns LLM/API failures as a normal answer starting with this
+ERROR_ANSWER_PREFIX = "An error occurred while generating the response"
+
+_thread_state = threading.local()
+
+
+# Load the UserQuery column (and the logged answer, used for feedback payloads)
+def load_queries(log_file):
+    if not os.path.exists(log_file) and os.path.exists(os.path.basename(log_file)):
+        log_file = os.path.basename(log_file)
+
+    with open(log_file, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+
+    # logger.py writes a header row; older exports of the log have none
+    if rows and "UserQuery" in rows[0]:
+        header = rows.pop(0)
+        query_col, answer_col = header.index("UserQuery"), header.index("Answer")
+        id_col = header.index("MessageID") if "MessageID" in header else None
+    else:
+        query_col, answer_col, id_col = 1, 2, 7
+
+    queries = []
+    for row in rows:
+        if id_col is not None and len(row) > id_col and row[id_col].startswith(MESSAGE_ID_PREFIX):
+            continue
+        if len(row) > answer_col and row[query_col].strip():
+            queries.append((row[query_col].strip(), row[answer_col]))
+    return queries
+
+
+# Build the request plan: which endpoint each request hits and with which query.
+# With repeat_ratio=None the log is replayed as-is, so its own repetition decides the cache hit rate.
+# Otherwise each /ask is either "new" (a distinct logged query suffixed with this run's nonce, so the
+# server cache has never seen it) or a "repeat" of a query already sent in this run.
+def build_plan(queries, total, feedback_ratio, seed, repeat_ratio=None, nonce=""):
+    rng = random.Random(seed)
+    n_feedback = round(total * feedback_ratio)
+    n_ask = total - n_feedback
+    feedback = [
+        {"endpoint": "/log_feedback", "kind": "feedback", "query": query, "answer": answer}
+        for query, answer in (rng.choice(queries) for _ in range(n_feedback))
+    ]
+
+    if repeat_ratio is None:
+        asks = [
+            {"endpoint": "/ask", "kind": "replay", "query": query, "answer": answer}
+            for query, answer in (rng.choice(queries) for _ in range(n_ask))
+        ]
+    else:
+        distinct = list({q: (q, a) for q, a in queries}.values())
+        rng.shuffle(distinct)
+        n_new = round(n_ask * (1 - repeat_ratio))
+        if n_ask and not n_new:
+            n_new = 1  # repeats need a query to repeat
+        n_repeat = n_ask - n_new
+
+        if n_new > len(distinct):
+            # Reusing a logged query would make it a repeat, so scale the whole run down instead
+            scale = len(distinct) / n_new
+            n_new = len(distinct)
+            n_repeat = round(n_repeat * scale)
+            feedback = feedback[:round(n_feedback * scale)]
+            print(f"⚠️ Only {len(distinct)} distinct queries in the log, sending "
+                  f"{n_new + n_repeat + len(feedback)} requests instead of {total}")
+
+        kinds = ["new"] * n_new + ["repeat"] * n_repeat
+        rng.shuffle(kinds)
+        if kinds and kinds[0] != "new":
+            first_new = kinds.index("new")
+            kinds[0], kinds[first_new] = "new", "repeat"
+
+        asks, sent = [], []
+        for kind in kinds:
+            if kind == "new":
+                query, answer = distinct[len(sent)]
+                sent.append((f"{query} [{nonce}]" if nonce else query, answer))
+                query, answer = sent[-1]
+            else:
+                query, answer = rng.choice(sent)
+            asks.append({"endpoint": "/ask", "kind": kind, "query": query, "answer": answer})
+
+    # Spread feedback through the run without reordering /ask (a repeat must follow its first send)
+    plan = asks
+    for item in feedback:
+        plan.insert(rng.randint(0, len(plan)), item)
+    return plan
+
+
+def _session():
+    if not hasattr(_thread_state, "session"):
+        _thread_state.session = requests.Session()
+    return _thread_state.session
+
+
+def send_request(base_url, item, timeout, scheduled_at):
+    if item["endpoint"] == "/ask":
+        payload = {"query": item["query"]}
+    else:
+        payload = {
+            "messageId": MESSAGE_ID_PREFIX + str(uuid.uuid4()),
+            "feedback": random.choice(["👍", "👎"]),
+            "query": item["query"],
+            "botResponse": item["answer"] or "n/a",
+            "escalated": False,
+            "escalationReason": None
+        }
+
+    started = time.perf_counter()
+    record = {"endpoint": item["endpoint"], "kind": item["kind"], "status": None, "ok": False, "escalate": False, "error": None}
+    try:
+        resp = _session().post(base_url + item["endpoint"], json=payload, timeout=timeout)
+        record["status"] = resp.status_code
+        record["ok"] = resp.status_code == 200
+        if item["endpoint"] == "/ask" and resp.ok:
+            body = resp.json()
+            record["escalate"] = bool(body.get("escalate"))
+            # LLM failures come back as a 200 with an error message in the answer
+            answer = body.get("answer") or ""
+            if answer.startswith(ERROR_ANSWER_PREFIX):
+                record["ok"] = False
+                record["error"] = "llm_error"
+    except requests.exceptions.Timeout:
+        record["error"] = "timeout"
+    except requests.exceptions.RequestException as e:
+        record["error"] = type(e).__name__
+
+    finished = time.perf_counter()
+    record["service_ms"] = (finished - started) * 1000
+    # Measured from the scheduled arrival so client-side queueing is not hidden (coordinated omission)
+    record["latency_ms"] = (finished - scheduled_at) * 1000
+    return record
+
+
+def fetch_cache_stats(base_url):
+    try:
+        resp = requests.get(base_url + "/cache_stats", timeout=5)
+        return resp.json() if resp.ok else None
+    except requests.exceptions.RequestException:
+        return None
+
+
+def run_load(base_url, plan, concurrency, rate, timeout, seed):
+    rng = random.Random(seed)
+    futures = []
+    start = time.perf_counter()
+    next_arrival = start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for item in plan:
+            if rate > 0:
+                # Open loop: Poisson arrivals at the requested rate
+                next_arrival += rng.expovariate(rate)
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                scheduled_at = next_arrival
+            else:
+                # Closed loop: as fast as the worker pool allows
+                scheduled_at = None
+            futures.append(pool.submit(_timed_send, base_url, item, timeout, scheduled_at))
+
+        records = [f.result() for f in futures]
+
+    return records, time.perf_counter() - start
+
+
+def _timed_send(base_url, item, timeout, scheduled_at):
+    return send_request(base_url, item, timeout, scheduled_at or time.perf_counter())
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 2)
+
+
+def summarize(records):
+    latencies = [r["latency_ms"] for r in records]
+    errors = [r for r in records if not r["ok"]]
+    status_counts = {}
+    for r in records:
+        key = str(r["status"] if r["status"] is not None else r["error"])
+        status_counts[key] = status_counts.get(key, 0) + 1
+    return {
+        "requests": len(records),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(records), 4) if records else 0.0,
+        "timeouts": sum(1 for r in records if r["error"] == "timeout"),
+        "status_counts": status_counts,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(max(latencies), 2) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None
+        }
+    }
+
+
+def build_report(args, records, elapsed, cache_before, cache_after):
+    report = {
+        "label": args.label,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "config": {
+            "url": args.url,
+            "requests": len(records),
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "feedback_ratio": args.feedback_ratio,
+            "repeat_ratio": args.repeat_ratio,
+            "nonce": args.nonce,
+            "timeout": args.timeout,
+            "seed": args.seed
+        },
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(records) / elapsed, 2) if elapsed else 0.0,
+        "overall": summarize(records),
+        "endpoints": {}
+    }
+    for endpoint in sorted({r["endpoint"] for r in records}):
+        report["endpoints"][endpoint] = summarize([r for r in records if r["endpoint"] == endpoint])
+
+    # new = cold LLM path, repeat = cache (or coalesced) path; only present with --repeat-ratio/--unique
+    report["ask_kinds"] = {}
+    for kind in ["new", "repeat"]:
+        kind_records = [r for r in records if r["kind"] == kind]
+        if kind_records:
+            report["ask_kinds"][kind] = summarize(kind_records)
+
+    ask_records = [r for r in records if r["endpoint"] == "/ask" and r["status"] == 200]
+    report["escalation_rate"] = (
+        round(sum(r["escalate"] for r in ask_records) / len(ask_records), 4) if ask_records else None
+    )
+
+    # Server-side lru_cache counters, diffed so earlier traffic does not skew the run
+    if cache_before and cache_after:
+        hits = cache_after["hits"] - cache_before["hits"]
+        misses = cache_after["misses"] - cache_before["misses"]
+        # Servers without in-flight coalescing (plain lru_cache) do not report it
+        coalesced = cache_after.get("coalesced", 0) - cache_before.get("coalesced", 0)
+        report["cache"] = {
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_rate": round(hits / (hits + misses + coalesced), 4) if hits + misses + coalesced else 0.0
+        }
+    else:
+        report["cache"] = None
+    return report
+
+
+def print_report(report):
+    print("\n📈 Load Test Summary")
+    print("-" * 30)
+    print(f"Requests      : {report['overall']['requests']} in {report['elapsed_s']} s")
+    print(f"Throughput    : {report['throughput_rps']} req/s")
+    print(f"Error Rate    : {report['overall']['error_rate'] * 100:.2f}% ({report['overall']['status_counts']})")
+    if report["escalation_rate"] is not None:
+        print(f"Escalations   : {report['escalation_rate'] * 100:.2f}% of /ask")
+    if report["cache"]:
+        print(f"Cache Hit Rate: {report['cache']['hit_rate'] * 100:.2f}% "
+              f"({report['cache']['hits']} hits / {report['cache']['misses']} misses / "
+              f"{report['cache']['coalesced']} coalesced)")
+    else:
+        print("Cache Hit Rate: n/a (/cache_stats unavailable)")
+
+    for endpoint, stats in [*report["endpoints"].items(), *((f"/ask {k}", v) for k, v in report["ask_kinds"].items())]:
+        lat = stats["latency_ms"]
+        print(f"\n{endpoint}  ({stats['requests']} requests, {stats['error_rate'] * 100:.2f}% errors)")
+        print(f"  p50 {lat['p50']} ms | p90 {lat['p90']} ms | p95 {lat['p95']} ms | "
+              f"p99 {lat['p99']} ms | max {lat['max']} ms")
+
+
+# Print the change against a previously saved run
+def print_comparison(report, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def delta(new, old):
+        if new is None or old is None:
+            return "n/a"
+        change = f" ({(new - old) / old * 100:+.1f}%)" if old else ""
+        return f"{old} -> {new}{change}"
+
+    print(f"\n🔁 Compared to {baseline_path} ({baseline.get('label') or baseline.get('timestamp')})")
+    print("-" * 30)
+    print(f"Throughput    : {delta(report['throughput_rps'], baseline['throughput_rps'])}")
+    print(f"Error Rate    : {delta(report['overall']['error_rate'], baseline['overall']['error_rate'])}")
+    for endpoint, stats in report["endpoints"].items():
+        old = baseline["endpoints"].get(endpoint)
+        if not old:
+            continue
+        for pct in ["p50", "p99"]:
+            print(f"{endpoint} {pct}: {delta(stats['latency_ms'][pct], old['latency_ms'][pct])}")
+
+
+def save_report(report, records, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    name = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if report["label"]:
+        name += f"_{report['label']}"
+    path = os.path.join(output_dir, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**report, "records": records}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay chat_log.csv queries against api.py")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Base URL of the running API")
+    parser.add_argument("--log-file", default=LOG_FILE, help="Chat log CSV to replay")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum in-flight requests")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Arrival rate in req/s (Poisson); 0 sends as fast as concurrency allows")
+    parser.add_argument("--feedback-ratio", type=float, default=0.1,
+                        help="Fraction of requests sent to /log_feedback instead of /ask")
+    parser.add_argument("--repeat-ratio", type=float, default=None,
+                        help="Fraction of /ask requests that repeat a query already sent in this run; "
+                             "the rest are distinct logged queries made unique to this run, so the server "
+                             "cache is cold for them. Default: replay the log as-is")
+    parser.add_argument("--unique", action="store_true",
+                        help="Shorthand for --repeat-ratio 0: every /ask takes the LLM path. Requests are "
+                             "capped so no logged query is sent twice")
+    parser.add_argument("--timeout", type=float, default=SERVER_REQUEST_TIMEOUT_S + 5,
+                        help="Per-request client timeout in seconds; keep it above the server's REQUEST_TIMEOUT_S "
+                             "so a server-side timeout is counted as a 504, not a client timeout")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the query mix and arrivals")
+    parser.add_argument("--label", default="", help="Name for this run, e.g. 'before-async'")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Where to save the JSON results")
+    parser.add_argument("--compare", help="Previous results JSON to compare this run against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    queries = load_queries(args.log_file)
+    if not queries:
+        print("❌ No queries found in the log file. Run the chatbot first to generate logs.")
+        exit()
+
+    if args.unique:
+        args.repeat_ratio = 0.0
+    if args.repeat_ratio is not None and not 0 <= args.repeat_ratio <= 1:
+        print("❌ --repeat-ratio must be between 0 and 1.")
+        exit()
+    # Per-run suffix that keeps "new" queries out of the server cache left warm by earlier runs
+    args.nonce = f"run {uuid.uuid4().hex[:8]}" if args.repeat_ratio is not None else ""
+
+    plan = build_plan(queries, args.requests, args.feedback_ratio, args.seed, args.repeat_ratio, args.nonce)
+    print(f"Replaying {len(plan)} requests ({len(queries)} logged queries) against {args.url} "
+          f"with concurrency={args.concurrency}, rate={args.rate or 'unbounded'}")
+
+    cache_before = fetch_cache_stats(args.url)
+    records, elapsed = run_load(args.url, plan, args.concurrency, args.rate, args.timeout, args.seed)
+    cache_after = fetch_cache_stats(args.url)
+
+    report = build_report(args, records, elapsed, cache_before, cache_after)
+    print_report(report)
+    if args.compare:
+        print_comparison(report, args.compare)
+
+    path = save_report(report, records, args.output_dir)
+    print(f"\n💾 Results saved to {path}")
@@ -2,8 +2,11 @@ import csv
 import os
 from datetime import datetime
 
-# Log file path
-LOG_FILE = "logs/chat_log.csv"
+# Log file path. Load tests against the stub LLM (WELLEAZY_STUB_LLM=1) write to a separate file
+# so synthetic feedback never reaches the production log; CHAT_LOG_FILE overrides both.
+LOAD_TEST_LOG_FILE = "logs/load_test_chat_log.csv"
+_stub_mode = os.getenv("WELLEAZY_STUB_LLM", "").lower() in ("1", "true", "yes")
+LOG_FILE = os.getenv("CHAT_LOG_FILE") or (LOAD_TEST_LOG_FILE if _stub_mode else "logs/chat_log.csv")
 
 # Initialize CSV with proper headers
 def init_logger():
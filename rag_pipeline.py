@@ -5,6 +5,8 @@ import numpy as np
 from dotenv import load_dotenv
 from sentence_transformers import SentenceTransformer
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import openai
 import sys
 
@@ -12,11 +14,20 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from scripts.logger import init_logger, log_query
 from scripts.evaluate_response import evaluate
+from scripts.stub_llm import StubChatCompletion, stub_enabled
+from scripts.async_cache import async_lru_cache
 
 # Load environment variables
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# Offline stub LLM for load testing (WELLEAZY_STUB_LLM=1), otherwise the real OpenAI client
+ChatCompletion = StubChatCompletion if stub_enabled() else openai.ChatCompletion
+
+# Bounded pool for CPU-bound encode/search/evaluate work in the async path
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 4)))
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="rag-cpu")
+
 # Load metadata
 with open("vector_store/welleazy_metadata.json", "r", encoding="utf-8") as f:
     metadata = json.load(f)
@@ -53,18 +64,15 @@ def build_prompt(query, retrieved_chunks):
     )
     return prompt
 
-def chat(query):
-    global last_answer
-
-    # Human-in-the-Loop handling
+# Human-in-the-Loop handling
+def resolve_followup(query):
     vague_starters = ["what about", "is it", "does that", "is that", "how about", "what does it", "is it"]
     if any(query.lower().startswith(start) for start in vague_starters) and last_answer:
         query = f"{query} (Referring to: {last_answer})"
+    return query
 
-    # Chunk search
-    top_chunks = search(query, k=3)
-
-    # Guardrail 1: Out-of-context fallback
+# Guardrail 1: Out-of-context fallback
+def out_of_scope_response(top_chunks):
     if not top_chunks or all(len(chunk["content"].strip()) == 0 for chunk in top_chunks):
         return (
             "❌ This question appears to be outside the scope of Welleazy's website content.\n\n"
@@ -74,31 +82,65 @@ def chat(query):
             None,
             None
         )
+    return None
+
+def build_messages(prompt):
+    return [
+        {"role": "system", "content": "You are a helpful assistant for the Welleazy website. Use only the provided context."},
+        {"role": "user", "content": prompt}
+    ]
+
+# Guardrail 2: Weak response fallback
+def weak_answer_response(answer, context_text):
+    if not answer or "I'm not sure" in answer or len(answer) < 20:
+        return (
+            "Sorry, I couldn't generate a confident answer based on Welleazy's website content.\n\n"
+            "Please feel free to contact our support team for assistance:\n📞 +91-9071167676\n📧 hello@welleazy.com",
+            context_text,
+            None
+        )
+    return None
+
+# 🚧 Guardrail 4: Extremely low faithfulness = hallucinated / out-of-context
+def faithfulness_response(answer, context_text, metrics):
+    if metrics["faithfulness_score"] < 0.3:
+        return (
+            "I'm sorry, but I couldn't find reliable information for your question within Welleazy's website content.\n\n"
+            "For more details, please contact our support team:\n"
+            "📞 +91-9071167676\n📧 hello@welleazy.com",
+            context_text,
+            metrics
+        )
+    return answer, context_text, metrics
+
+def chat(query):
+    global last_answer
+
+    query = resolve_followup(query)
+
+    # Chunk search
+    top_chunks = search(query, k=3)
+
+    fallback = out_of_scope_response(top_chunks)
+    if fallback:
+        return fallback
 
     context_text = "\n\n".join([chunk["content"] for chunk in top_chunks])
     prompt = build_prompt(query, top_chunks)
 
     try:
-        response = openai.ChatCompletion.create(
+        response = ChatCompletion.create(
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant for the Welleazy website. Use only the provided context."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_messages(prompt),
             temperature=0.2,
             max_tokens=512
         )
 
         answer = response["choices"][0]["message"]["content"].strip()
 
-        # Guardrail 2: Weak response fallback
-        if not answer or "I'm not sure" in answer or len(answer) < 20:
-            return (
-                "Sorry, I couldn't generate a confident answer based on Welleazy's website content.\n\n"
-                "Please feel free to contact our support team for assistance:\n📞 +91-9071167676\n📧 hello@welleazy.com",
-                context_text,
-                None
-            )
+        fallback = weak_answer_response(answer, context_text)
+        if fallback:
+            return fallback
 
         # Store last answer for HiTL memory
         last_answer = answer
@@ -106,27 +148,65 @@ def chat(query):
         # Evaluate LLM answer
         metrics = evaluate(query, answer, context_text)
 
-        # 🚧 Guardrail 4: Extremely low faithfulness = hallucinated / out-of-context
-        if metrics["faithfulness_score"] < 0.3:
-            return (
-                "I'm sorry, but I couldn't find reliable information for your question within Welleazy's website content.\n\n"
-                "For more details, please contact our support team:\n"
-                "📞 +91-9071167676\n📧 hello@welleazy.com",
-                context_text,
-                metrics
-            )
-
-        return answer, context_text, metrics
+        return faithfulness_response(answer, context_text, metrics)
 
     except Exception as e:
         # 🚧 Guardrail 3: API failure
         return f"An error occurred while generating the response: {str(e)}", None, None
 
+# Async variant of chat() for api.py: awaits the LLM call instead of blocking a thread,
+# and runs the CPU-bound embedding/FAISS/evaluation work in the bounded cpu_executor
+async def achat(query):
+    global last_answer
+    loop = asyncio.get_running_loop()
+
+    query = resolve_followup(query)
+
+    # Chunk search
+    top_chunks = await loop.run_in_executor(cpu_executor, search, query, 3)
+
+    fallback = out_of_scope_response(top_chunks)
+    if fallback:
+        return fallback
+
+    context_text = "\n\n".join([chunk["content"] for chunk in top_chunks])
+    prompt = build_prompt(query, top_chunks)
+
+    try:
+        response = await ChatCompletion.acreate(
+            model="gpt-4o-mini",
+            messages=build_messages(prompt),
+            temperature=0.2,
+            max_tokens=512
+        )
+
+        answer = response["choices"][0]["message"]["content"].strip()
+
+        fallback = weak_answer_response(answer, context_text)
+        if fallback:
+            return fallback
+
+        # Store last answer for HiTL memory
+        last_answer = answer
+
+        # Evaluate LLM answer
+        metrics = await loop.run_in_executor(cpu_executor, evaluate, query, answer, context_text)
+
+        return faithfulness_response(answer, context_text, metrics)
+
+    except Exception as e:
+        # 🚧 Guardrail 3: API failure (cancellation is not an Exception and propagates)
+        return f"An error occurred while generating the response: {str(e)}", None, None
+
 # Cache frequent queries
 @lru_cache(maxsize=100)
 def cached_chat(query):
     return chat(query)
 
+@async_lru_cache(maxsize=100)
+async def acached_chat(query):
+    return await achat(query)
+
 #CLI interface for testing
 if __name__ == "_main_":
     print("Welleazy Chatbot (GPT-4o-mini via OpenAI). Type 'exit' to quit.\n")
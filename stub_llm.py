@@ -0,0 +1,64 @@
+import asyncio
+import os
+import random
+import re
+import time
+
+# Offline stand-in for openai.ChatCompletion used by load tests.
+# Enable it with WELLEAZY_STUB_LLM=1 before starting api.py so no OpenAI quota is spent.
+
+# Latency model: log-normal around the median OpenAI round trip we see in production (1-5 s)
+STUB_MEDIAN_S = float(os.getenv("STUB_LLM_MEDIAN_S", "1.5"))
+STUB_SIGMA = float(os.getenv("STUB_LLM_SIGMA", "0.5"))
+STUB_MIN_S = float(os.getenv("STUB_LLM_MIN_S", "0.2"))
+STUB_MAX_S = float(os.getenv("STUB_LLM_MAX_S", "8.0"))
+
+# Fraction of calls that fail like a rate-limited / overloaded upstream
+STUB_ERROR_RATE = float(os.getenv("STUB_LLM_ERROR_RATE", "0.0"))
+
+
+def stub_enabled():
+    return os.getenv("WELLEAZY_STUB_LLM", "").lower() in ("1", "true", "yes")
+
+
+def sample_latency():
+    latency = random.lognormvariate(0, STUB_SIGMA) * STUB_MEDIAN_S
+    return min(max(latency, STUB_MIN_S), STUB_MAX_S)
+
+
+# Build a plausible answer from the context lines of the prompt, so the
+# faithfulness guardrail in rag_pipeline.py behaves like it does with a real model
+def build_stub_answer(messages):
+    prompt = messages[-1]["content"] if messages else ""
+    match = re.search(r"=== CONTEXT ===\n(.*?)\n\n=== INSTRUCTIONS ===", prompt, re.S)
+    context = match.group(1) if match else prompt
+    lines = [line.lstrip("- ").strip() for line in context.splitlines() if line.strip()]
+    answer = " ".join(lines)[:600].strip()
+    if len(answer) < 20:
+        answer = "Welleazy provides corporate healthcare and wellness services for employees."
+    return answer
+
+
+def _stub_response(messages, max_tokens):
+    if random.random() < STUB_ERROR_RATE:
+        raise RuntimeError("Stub LLM: simulated rate limit (429)")
+    answer = build_stub_answer(messages)
+    # Rough token cap: ~4 characters per token
+    answer = answer[: max_tokens * 4]
+    return {
+        "choices": [{"message": {"role": "assistant", "content": answer}}],
+        "model": "stub-llm",
+    }
+
+
+# Same call shape as openai.ChatCompletion.create / acreate
+class StubChatCompletion:
+    @staticmethod
+    def create(model=None, messages=None, temperature=None, max_tokens=512, **kwargs):
+        time.sleep(sample_latency())
+        return _stub_response(messages or [], max_tokens)
+
+    @staticmethod
+    async def acreate(model=None, messages=None, temperature=None, max_tokens=512, **kwargs):
+        await asyncio.sleep(sample_latency())
+        return _stub_response(messages or [], max_tokens)
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from async_cache import async_lru_cache
+
+
+def make_cached(delay=0.05, maxsize=100):
+    calls = []
+    cancelled = []
+
+    @async_lru_cache(maxsize=maxsize)
+    async def answer(query):
+        calls.append(query)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return query.upper()
+
+    return answer, calls, cancelled
+
+
+class AsyncLruCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_duplicates_share_one_call(self):
+        answer, calls, _ = make_cached()
+
+        results = await asyncio.gather(answer("q"), answer("q"), answer("q"))
+
+        self.assertEqual(results, ["Q", "Q", "Q"])
+        self.assertEqual(calls, ["q"])
+        info = answer.cache_info()
+        self.assertEqual((info.hits, info.misses, info.coalesced, info.currsize), (0, 1, 2, 1))
+
+        self.assertEqual(await answer("q"), "Q")
+        self.assertEqual(answer.cache_info().hits, 1)
+
+    async def test_timeout_cancels_call_and_caches_nothing(self):
+        answer, calls, cancelled = make_cached(delay=0.2)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(answer("q"), 0.01)
+        await asyncio.sleep(0)
+
+        self.assertEqual(cancelled, ["q"])
+        self.assertEqual(answer.cache_info().currsize, 0)
+
+    async def test_cancelling_one_waiter_keeps_call_for_the_others(self):
+        answer, calls, cancelled = make_cached()
+
+        first = asyncio.ensure_future(answer("q"))
+        second = asyncio.ensure_future(answer("q"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        self.assertEqual(await second, "Q")
+        self.assertEqual(calls, ["q"])
+        self.assertEqual(cancelled, [])
+
+    async def test_caller_arriving_after_cancel_starts_fresh_call(self):
+        answer, calls, cancelled = make_cached()
+
+        first = asyncio.ensure_future(answer("q"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        # Joins before the cancelled call's done-callback has run
+        second = asyncio.ensure_future(answer("q"))
+
+        self.assertEqual(await second, "Q")
+        self.assertEqual(calls, ["q", "q"])
+        self.assertEqual(cancelled, ["q"])
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_evicts_least_recently_used(self):
+        answer, calls, _ = make_cached(delay=0, maxsize=2)
+
+        await answer("a")
+        await answer("b")
+        await answer("a")
+        await answer("c")
+        await answer("b")
+
+        self.assertEqual(calls, ["a", "b", "c", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+
+import load_test
+
+
+def write_csv(rows):
+    f = tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False)
+    with f:
+        csv.writer(f).writerows(rows)
+    return f.name
+
+
+def make_args(**overrides):
+    args = dict(label="", url="http://test", concurrency=1, rate=0.0, feedback_ratio=0.0,
+                repeat_ratio=None, nonce="", timeout=35.0, seed=1)
+    args.update(overrides)
+    return Namespace(**args)
+
+
+def ask_record(kind="replay", latency=100.0):
+    return {"endpoint": "/ask", "kind": kind, "status": 200, "ok": True, "escalate": False,
+            "error": None, "latency_ms": latency}
+
+
+class PercentileTest(unittest.TestCase):
+    def test_interpolates_between_ranks(self):
+        values = [40, 10, 30, 20]
+        self.assertEqual(load_test.percentile(values, 0), 10)
+        self.assertEqual(load_test.percentile(values, 50), 25)
+        self.assertEqual(load_test.percentile(values, 90), 37)
+        self.assertEqual(load_test.percentile(values, 100), 40)
+
+    def test_single_and_empty(self):
+        self.assertEqual(load_test.percentile([7], 99), 7)
+        self.assertIsNone(load_test.percentile([], 50))
+
+
+class LoadQueriesTest(unittest.TestCase):
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_header_row_selects_columns_and_skips_load_test_rows(self):
+        self.path = write_csv([
+            ["Timestamp", "UserQuery", "Answer", "AnswerLength", "RelevanceScore", "FaithfulnessScore",
+             "UserFeedback", "MessageID", "Escalated", "EscalationReason"],
+            ["t", "what services", "checkups", "8", "", "", "", "", "", ""],
+            ["t", "synthetic", "x", "1", "", "", "👍", "loadtest-123", "No", ""],
+        ])
+        self.assertEqual(load_test.load_queries(self.path), [("what services", "checkups")])
+
+    def test_headerless_log_uses_positional_columns(self):
+        self.path = write_csv([
+            ["t", "hey", "hello there", "11", "", "", "👎"],
+            ["t", "  ", "blank query is skipped", "22", "", "", ""],
+            ["t", "pricing", "plans", "5", "", "", "", "loadtest-9"],
+        ])
+        self.assertEqual(load_test.load_queries(self.path), [("hey", "hello there")])
+
+
+class BuildPlanTest(unittest.TestCase):
+    queries = [(f"q{i % 10}", f"a{i % 10}") for i in range(30)]
+
+    def build(self, *args, **kwargs):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            plan = load_test.build_plan(self.queries, *args, **kwargs)
+        return plan, out.getvalue()
+
+    def test_unique_caps_at_distinct_queries_and_warns(self):
+        plan, output = self.build(500, 0.0, 1, repeat_ratio=0.0, nonce="run x")
+
+        self.assertEqual(len(plan), 10)
+        self.assertEqual(len({item["query"] for item in plan}), 10)
+        self.assertTrue(all(item["query"].endswith(" [run x]") for item in plan))
+        self.assertIn("Only 10 distinct queries", output)
+        self.assertIn("sending 10 requests instead of 500", output)
+
+    def test_unique_within_limit_does_not_warn(self):
+        plan, output = self.build(8, 0.0, 1, repeat_ratio=0.0, nonce="run x")
+
+        self.assertEqual(len(plan), 8)
+        self.assertEqual(output, "")
+
+    def test_feedback_does_not_use_up_new_queries(self):
+        plan, _ = self.build(10, 0.5, 1, repeat_ratio=0.0, nonce="run x")
+        asks = [item for item in plan if item["endpoint"] == "/ask"]
+
+        self.assertEqual(len(asks), 5)
+        self.assertEqual(len({item["query"] for item in asks}), 5)
+        self.assertEqual(sum(item["endpoint"] == "/log_feedback" for item in plan), 5)
+
+    def test_repeat_ratio_sets_mix_and_repeats_follow_first_send(self):
+        plan, _ = self.build(20, 0.0, 3, repeat_ratio=0.75, nonce="run x")
+
+        self.assertEqual(sum(item["kind"] == "new" for item in plan), 5)
+        self.assertEqual(sum(item["kind"] == "repeat" for item in plan), 15)
+        seen = set()
+        for item in plan:
+            if item["kind"] == "repeat":
+                self.assertIn(item["query"], seen)
+            seen.add(item["query"])
+
+    def test_default_replays_log_as_is(self):
+        plan, _ = self.build(50, 0.2, 1)
+
+        self.assertEqual(len(plan), 50)
+        self.assertEqual(sum(item["endpoint"] == "/log_feedback" for item in plan), 10)
+        self.assertTrue(all(item["query"] in dict(self.queries) for item in plan))
+
+
+class CacheReportTest(unittest.TestCase):
+    def report(self, before, after):
+        return load_test.build_report(make_args(), [ask_record()], 1.0, before, after)["cache"]
+
+    def test_hit_rate_without_coalesced(self):
+        cache = self.report({"hits": 5, "misses": 5}, {"hits": 11, "misses": 7})
+
+        self.assertEqual(cache, {"hits": 6, "misses": 2, "coalesced": 0, "hit_rate": 0.75})
+
+    def test_coalesced_counts_as_lookup_not_hit(self):
+        cache = self.report({"hits": 0, "misses": 0, "coalesced": 1},
+                            {"hits": 2, "misses": 4, "coalesced": 3})
+
+        self.assertEqual(cache, {"hits": 2, "misses": 4, "coalesced": 2, "hit_rate": 0.25})
+
+    def test_no_lookups_and_missing_stats(self):
+        self.assertEqual(self.report({"hits": 1, "misses": 1}, {"hits": 1, "misses": 1})["hit_rate"], 0.0)
+        self.assertIsNone(self.report(None, {"hits": 1, "misses": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()